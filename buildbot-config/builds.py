@@ -1,9 +1,11 @@
 import collections.abc
 from datetime import timedelta
+import functools
 import multiprocessing
 import os
 import shutil
 import sys
+import typing
 import urllib.parse as urlp
 
 from buildbot.plugins import util
@@ -15,22 +17,135 @@ from utils import scummsteps
 import config
 import workers
 
-max_jobs = getattr(config, 'max_jobs', None) or (multiprocessing.cpu_count() + 1)
+def _cgroup_cpu_quota():
+    # CPU quota of cgroup v2 the master runs in, taking its ancestors into account
+    try:
+        with open("/proc/self/cgroup") as f:
+            for line in f:
+                if line.startswith("0::"):
+                    cgroup = line[3:].strip()
+                    break
+            else:
+                return None
+    except OSError:
+        return None
+
+    quota_cpus = None
+    path = cgroup
+    while True:
+        # cpu.max format is "$MAX $PERIOD" with $MAX possibly "max"
+        try:
+            with open(os.path.join("/sys/fs/cgroup", path.lstrip("/"), "cpu.max")) as f:
+                quota, period = f.read().split()
+            if quota != "max":
+                cpus = -(-int(quota) // int(period))
+                quota_cpus = cpus if quota_cpus is None else min(quota_cpus, cpus)
+        except (OSError, ValueError, ZeroDivisionError):
+            # Root cgroup has no cpu.max file
+            pass
+        if path in ("", "/"):
+            return quota_cpus
+        path = os.path.dirname(path)
+
+def _cpu_count():
+    # Builder workers are containers on the same host as the master:
+    # use CPUs the master is allowed to use as an estimate of what they can use
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = multiprocessing.cpu_count()
+
+    quota_cpus = _cgroup_cpu_quota()
+    if quota_cpus is None:
+        return cpus
+    return max(1, min(cpus, quota_cpus))
+
+max_jobs = getattr(config, 'max_jobs', None) or (_cpu_count() + 1)
+# max_jobs is fixed when configuration is loaded
+_MAKE_JOBS_ARG = f"-j{max_jobs}"
 
 # Lock to avoid running more than 1 build at the same time on a worker
 # This lock is used for builder workers to avoid too high CPU load
 # It's also used for fetcher worker to ensure that fetching will occur just before building
 # thanks to fetcher being locked all the way through the build process
 lock_build = util.WorkerLock("worker", maxCount = 1)
+# Lock accesses are immutable: share them between all builders
+lock_build_counting = lock_build.access('counting')
+
+# Properties renderables are immutable: share them between all steps
+_PROP_REV = util.Property('got_revision', defaultWhenFalse=False)
+_PROP_CLEAN = util.Property('clean', defaultWhenFalse=False)
+_PROP_PACKAGE = util.Property('package', defaultWhenFalse=False)
+# Properties forwarded by fetch builders to platform builders
+_TRIGGER_PROPS = {
+    'got_revision': _PROP_REV,
+    'clean': _PROP_CLEAN,
+    'package': _PROP_PACKAGE,
+}
+
+# Force schedulers parameters are the same for all builds
+_FORCE_REASON = util.StringParameter(name="reason", label="Reason:", required=True, size=80)
+_FORCE_CODEBASES = [util.CodebaseParameter(codebase='', hide=True)]
+_FORCE_BUILD_PROPS = [
+    util.BooleanParameter(name="clean", label="Clean", default=False),
+    util.BooleanParameter(name="package", label="Package", default=False),
+]
+_FORCE_CLEAN_REASON = util.StringParameter(name="reason", hide=True)
+_FORCE_CLEAN_PROPS = [
+    util.BooleanParameter(name="dry_run", label="Dry run", default=False),
+]
 
 # We only create here directories which are not worker related or for which we have customization to do
 # The worker ones get created at instantiation
 # ccache is the cache for compiled objects used by ccache
 # pollers is used by poll modules to maintain their state
-for data_dir in ["ccache", "pollers"]:
-    os.makedirs(os.path.join(config.data_dir, data_dir), exist_ok=True)
-shutil.copyfile(os.path.join(config.configuration_dir, "ccache.conf"),
-    os.path.join(config.data_dir, "ccache", "ccache.conf"))
+_DATA_SUBDIRS = frozenset(["ccache", "pollers"])
+
+def _ensure_data_dirs():
+    # List data directory once and only create missing directories
+    try:
+        with os.scandir(config.data_dir) as it:
+            existing = { e.name for e in it if e.is_dir() }
+    except FileNotFoundError:
+        os.makedirs(config.data_dir)
+        existing = set()
+    for data_dir in _DATA_SUBDIRS - existing:
+        os.makedirs(os.path.join(config.data_dir, data_dir), exist_ok=True)
+
+    # Only write ccache configuration when its content has changed
+    # Timestamps aren't reliable here: a checkout of the configuration updates them
+    src = os.path.join(config.configuration_dir, "ccache.conf")
+    dst = os.path.join(config.data_dir, "ccache", "ccache.conf")
+    with open(src, 'rb') as f:
+        src_data = f.read()
+    try:
+        with open(dst, 'rb') as f:
+            dst_data = f.read()
+    except FileNotFoundError:
+        dst_data = None
+    if src_data != dst_data:
+        # Replace atomically to never let ccache read a partially written file
+        tmp = dst + ".tmp"
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(src_data)
+            # Keep permissions of the replaced file like a copy would have done
+            if dst_data is not None:
+                shutil.copymode(dst, tmp)
+            os.replace(tmp, dst)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+_ensure_data_dirs()
+
+# Time at which daily builds are done
+class Daily(typing.NamedTuple):
+    hour: int
+    minute: int
 
 class Build:
     __slots__ = ['name']
@@ -38,7 +153,7 @@ class Build:
     def __init__(self, name):
         self.name = name
 
-    def getChangeSource(self, settings):
+    def getChangeSource(self, settings, *, shared_with=()):
         raise NotImplementedError
 
     def getSchedulers(self, platforms):
@@ -62,10 +177,12 @@ class StandardBuild(Build):
         'daily', 'enable_force',
         'verbose_build',
         'description_',
-        'lock_src']
+        'change_filter',
+        'daily_builds_path', 'daily_builds_url',
+        'lock_src', 'lock_src_read', 'lock_src_write']
 
-    PATCHES = []
-    DATA_FILES = []
+    PATCHES = ()
+    DATA_FILES = ()
     VERBOSE_BUILD_FLAG = None
 
     CONFIGURE_GENERATED_FILE = None
@@ -79,16 +196,28 @@ class StandardBuild(Build):
         self.baseurl = baseurl
         self.giturl = giturl
         self.branch = branch
-        self.daily = daily
+        # Accept plain (hour, minute) tuples
+        self.daily = Daily(*daily) if daily is not None else None
         self.enable_force = enable_force
         self.verbose_build = verbose_build
         self.description_ = description
 
+        # Inputs are immutable: filter can be shared by all schedulers
+        self.change_filter = util.ChangeFilter(repository = [self.baseurl, self.giturl], branch = self.branch)
+
+        # daily_builds_path is used in Package step on master side
+        self.daily_builds_path = os.path.join(config.daily_builds_dir, self.name)
+        # Ensure last path component doesn't get removed here and in packaging step
+        self.daily_builds_url = urlp.urljoin(config.daily_builds_url + '/', self.name + '/')
+
         if self.CONFIGURE_GENERATED_FILE is None:
             raise Exception("Invalid CONFIGURE_GENERATED_FILE setting")
 
         # Lock used to avoid writing source code when it is read by another task
-        self.lock_src = util.MasterLock("src-{0}".format(self.name), maxCount=sys.maxsize)
+        # Readers (platform builders) never block each other, only the writer (fetch) is exclusive
+        self.lock_src = util.MasterLock(f"src-{self.name}", maxCount=sys.maxsize)
+        self.lock_src_read = self.lock_src.access("counting")
+        self.lock_src_write = self.lock_src.access("exclusive")
         self.buildNames()
 
     def buildNames(self):
@@ -96,31 +225,34 @@ class StandardBuild(Build):
         # Sort builder by type and definition order
         self.names = dict()
         # Pollers
-        self.names['poller'] = "poller-{0}".format(self.name)
+        self.names['poller'] = f"poller-{self.name}"
         # Schedulers
-        self.names['sch-sb'] = "branch-scheduler-{0}".format(self.name)
-        self.names['sch-daily'] = "daily-scheduler-{0}".format(self.name)
-        self.names['sch-build'] = "build-scheduler-{0}".format(self.name)
+        self.names['sch-sb'] = f"branch-scheduler-{self.name}"
+        self.names['sch-daily'] = f"daily-scheduler-{self.name}"
+        self.names['sch-build'] = f"build-scheduler-{self.name}"
         # Force schedulers
         # Force scheduler ID must begin with letter and not contain spaces
-        self.names['sch-force-id-fetch'] = "force-fetch-{0}".format(self.name)
-        self.names['sch-force-name-fetch'] = "Force fetch {0}".format(self.name)
-        self.names['sch-force-id-build'] = "force-build-{0}".format(self.name)
-        self.names['sch-force-name-build'] = "Force build".format(self.name)
-        self.names['sch-force-id-clean'] = "force-clean-{0}".format(self.name)
-        self.names['sch-force-name-clean'] = "Force clean {0} daily builds".format(self.name)
+        self.names['sch-force-id-fetch'] = f"force-fetch-{self.name}"
+        self.names['sch-force-name-fetch'] = f"Force fetch {self.name}"
+        self.names['sch-force-id-build'] = f"force-build-{self.name}"
+        self.names['sch-force-name-build'] = "Force build"
+        self.names['sch-force-id-clean'] = f"force-clean-{self.name}"
+        self.names['sch-force-name-clean'] = f"Force clean {self.name} daily builds"
         # Builders
-        self.names['bld-fetch'] = "fetch-{0}".format(self.name)
-        self.names['bld-daily'] = "daily-{0}".format(self.name)
+        self.names['bld-fetch'] = f"fetch-{self.name}"
+        self.names['bld-daily'] = f"daily-{self.name}"
         # Put clean builders in last position
-        self.names['bld-clean'] = "zzz_clean-{0}".format(self.name)
+        self.names['bld-clean'] = f"zzz_clean-{self.name}"
+        # Worker build directories
+        self.names['dir-fetch'] = f"/data/src/{self.name}"
+        self.names['dir-daily'] = f"/data/triggers/daily-{self.name}"
+        self.names['dir-clean'] = f"/data/triggers/cleanup-{self.name}"
         # Platform builders
-        builder_platform = "{0}-{{0}}".format(self.name)
         def get_platform_name(platforms):
             if isinstance(platforms, collections.abc.Iterable):
-                return (builder_platform.format(platform.name) for platform in platforms)
+                return (f"{self.name}-{platform.name}" for platform in platforms)
             else:
-                return builder_platform.format(platforms.name)
+                return f"{self.name}-{platforms.name}"
 
         self.names['bld-platform'] = get_platform_name
 
@@ -132,20 +264,30 @@ class StandardBuild(Build):
     def description(self, value):
         self.description_ = value
 
-    def getChangeSource(self, settings):
+    def getChangeSource(self, settings, *, shared_with=()):
+        # shared_with lists other builds of the same repository whose branches get polled too
+        if not shared_with:
+            return changes.GitPoller(
+                name=self.names['poller'],
+                repourl=self.giturl,
+                branches=[self.branch],
+                workdir=os.path.join(config.data_dir, 'pollers', self.name),
+                **settings)
+
+        builds = [self, *shared_with]
+        name = "+".join(build.name for build in builds)
         return changes.GitPoller(
-            name=self.names['poller'],
+            name=f"poller-{name}",
             repourl=self.giturl,
-            branches=[self.branch],
-            workdir=os.path.join(config.data_dir, 'pollers', self.name),
+            # Keep order and remove duplicates
+            branches=list(dict.fromkeys(build.branch for build in builds)),
+            workdir=os.path.join(config.data_dir, 'pollers', name),
             **settings)
 
     def getSchedulers(self, platforms):
-        change_filter = util.ChangeFilter(repository = [self.baseurl, self.giturl], branch = self.branch)
-
         # Fetch scheduler (triggered by event source)
         yield schedulers.SingleBranchScheduler(name = self.names['sch-sb'],
-                change_filter = change_filter,
+                change_filter = self.change_filter,
                 # Wait for 5 minutes before starting build
                 treeStableTimer = 300,
                 builderNames = [ self.names['bld-fetch'] ])
@@ -158,8 +300,8 @@ class StandardBuild(Build):
             yield schedulers.NightlyTriggerable(name = self.names['sch-daily'],
                 branch = self.branch,
                 builderNames = [ self.names['bld-daily'], self.names['bld-clean'] ],
-                hour = self.daily[0],
-                minute = self.daily[1],
+                hour = self.daily.hour,
+                minute = self.daily.minute,
                 onlyIfChanged = True)
 
         # All compiling builders
@@ -173,32 +315,24 @@ class StandardBuild(Build):
             yield schedulers.ForceScheduler(name = self.names['sch-force-id-fetch'],
                 buttonName=self.names['sch-force-name-fetch'],
                 label=self.names['sch-force-name-fetch'],
-                reason=util.StringParameter(name="reason", label="Reason:", required=True, size=80),
+                reason=_FORCE_REASON,
                 builderNames = [ self.names['bld-fetch'] ],
-                codebases = [util.CodebaseParameter(codebase='', hide=True)],
-                properties = [
-                    util.BooleanParameter(name="clean", label="Clean", default=False),
-                    util.BooleanParameter(name="package", label="Package", default=False),
-                    ])
+                codebases = _FORCE_CODEBASES,
+                properties = _FORCE_BUILD_PROPS)
             yield schedulers.ForceScheduler(name = self.names['sch-force-id-build'],
                 buttonName=self.names['sch-force-name-build'],
                 label=self.names['sch-force-name-build'],
-                reason=util.StringParameter(name="reason", label="Reason:", required=True, size=80),
+                reason=_FORCE_REASON,
                 builderNames = comp_builders,
-                codebases = [util.CodebaseParameter(codebase='', hide=True)],
-                properties = [
-                    util.BooleanParameter(name="clean", label="Clean", default=False),
-                    util.BooleanParameter(name="package", label="Package", default=False),
-                    ])
+                codebases = _FORCE_CODEBASES,
+                properties = _FORCE_BUILD_PROPS)
             yield schedulers.ForceScheduler(name = self.names['sch-force-id-clean'],
                 buttonName=self.names['sch-force-name-clean'],
                 label=self.names['sch-force-name-clean'],
-                reason=util.StringParameter(name="reason", hide=True),
+                reason=_FORCE_CLEAN_REASON,
                 builderNames = [ self.names['bld-clean'] ],
-                codebases = [util.CodebaseParameter(codebase='', hide=True)],
-                properties = [
-                    util.BooleanParameter(name="dry_run", label="Dry run", default=False),
-                    ])
+                codebases = _FORCE_CODEBASES,
+                properties = _FORCE_CLEAN_PROPS)
 
     def getGlobalBuilders(self, platforms):
         f = util.BuildFactory()
@@ -207,41 +341,37 @@ class StandardBuild(Build):
         f.addStep(steps.Git(mode = "incremental",
             repourl = self.giturl,
             branch = self.branch,
-            locks = [ self.lock_src.access("exclusive") ],
+            locks = [ self.lock_src_write ],
         ))
         if len(self.PATCHES):
             f.addStep(scummsteps.Patch(
                 base_dir = config.configuration_dir,
                 patches = self.PATCHES,
-                locks = [ self.lock_src.access("exclusive") ],
+                locks = [ self.lock_src_write ],
             ))
         if self.daily is not None:
             # Trigger daily scheduler to let it know the source stamp
             f.addStep(steps.Trigger(name="Updating source stamp",
-                schedulerNames = [ "daily-scheduler-{0}".format(self.name) ],
+                schedulerNames = [ self.names['sch-daily'] ],
                 set_properties = {
-                    'got_revision': util.Property('got_revision', defaultWhenFalse=False),
+                    'got_revision': _PROP_REV,
                 },
                 updateSourceStamp = True,
                 hideStepIf=(lambda r, s: r == util.SUCCESS),
             ))
         f.addStep(steps.Trigger(name="Building all platforms",
             schedulerNames = [ self.names['sch-build'] ],
-            set_properties = {
-                'got_revision': util.Property('got_revision', defaultWhenFalse=False),
-                'clean': util.Property('clean', defaultWhenFalse=False),
-                'package': util.Property('package', defaultWhenFalse=False)
-            },
+            set_properties = _TRIGGER_PROPS,
             updateSourceStamp = True,
             waitForFinish = True))
 
         yield util.BuilderConfig(
             name = self.names['bld-fetch'],
             workernames = workers.workers_by_type['fetcher'],
-            workerbuilddir = "/data/src/{0}".format(self.name),
+            workerbuilddir = self.names['dir-fetch'],
             factory = f,
             tags = ["fetch", self.name],
-            locks = [ lock_build.access('counting') ],
+            locks = [ lock_build_counting ],
         )
 
         if self.daily is not None:
@@ -251,7 +381,7 @@ class StandardBuild(Build):
                 updateSourceStamp = True,
                 waitForFinish = True,
                 set_properties = {
-                    'got_revision': util.Property('got_revision', defaultWhenFalse=False),
+                    'got_revision': _PROP_REV,
                     'clean': True,
                     'package': True,
                     # Ensure our tag is put first and is split from the others
@@ -261,18 +391,16 @@ class StandardBuild(Build):
                 name = self.names['bld-daily'],
                 # We use fetcher worker here as it will prevent building of other stuff like if a change had happened
                 workernames = workers.workers_by_type['fetcher'],
-                workerbuilddir = "/data/triggers/daily-{0}".format(self.name),
+                workerbuilddir = self.names['dir-daily'],
                 factory = f,
                 tags = ["daily", self.name],
-                locks = [ lock_build.access('counting') ]
+                locks = [ lock_build_counting ]
             )
 
-        daily_builds_path = os.path.join(config.daily_builds_dir, self.name)
-
         # Builder to clean packages
         f = util.BuildFactory()
         f.addStep(scummsteps.CleanupDailyBuilds(
-            dstpath = daily_builds_path,
+            dstpath = self.daily_builds_path,
             buildname = self.name,
             platformnames = [ platform.name
                 for platform in platforms
@@ -285,30 +413,26 @@ class StandardBuild(Build):
         yield util.BuilderConfig(
             name = self.names['bld-clean'],
             workernames = workers.workers_by_type['fetcher'],
-            workerbuilddir = "/data/triggers/cleanup-{0}".format(self.name),
+            workerbuilddir = self.names['dir-clean'],
             factory = f,
             tags = ["cleanup", self.name],
-            locks = [ lock_build.access('counting') ]
+            locks = [ lock_build_counting ]
         )
 
+    # Factories are intentionally not cached: each one is only created once per configuration load,
+    # steps modules get reloaded on reconfiguration and Buildbot already leaves alone builders
+    # whose configuration compares equal
     def getPerPlatformBuilders(self, platform):
         if not platform.canBuild(self):
             return
 
         # Don't use os.path.join as builder is a linux image
-        src_path = "{0}/src".format("/data")
-        build_path = "{0}/build".format("/data")
-
-        # daily_builds_path is used in Package step on master side
-        daily_builds_path = os.path.join(config.daily_builds_dir, self.name)
-        # Ensure last path component doesn't get removed here and in packaging step
-        daily_builds_url = urlp.urljoin(config.daily_builds_url + '/', self.name + '/')
+        src_path = "/data/src"
+        build_path = "/data/build"
 
         configure_path = src_path + "/configure"
 
-        env = platform.getEnv(self)
-        # Setup ccache as the compiler, use already set CXX as real compiler or environement CXX from docker image
-        env['CXX'] = 'ccache {0}'.format(env.get('CXX', '${CXX}'))
+        env = self.getBuildEnv(platform)
 
         f = util.BuildFactory()
         f.workdir = ""
@@ -330,10 +454,10 @@ class StandardBuild(Build):
         self.addPackagingSteps(f, platform,
             env = env,
             src_path = src_path,
-            daily_builds_path = daily_builds_path,
-            daily_builds_url = daily_builds_url)
+            daily_builds_path = self.daily_builds_path,
+            daily_builds_url = self.daily_builds_url)
 
-        locks = [ lock_build.access('counting'), self.lock_src.access("counting") ]
+        locks = [ lock_build_counting, self.lock_src_read ]
         if platform.lock_access:
             locks.append(platform.lock_access(self))
 
@@ -351,12 +475,33 @@ class StandardBuild(Build):
             },
         )
 
-    def addCleanSteps(self, f, platform, *, env):
+    # Environment shared by all steps of a platform builder
+    def getBuildEnv(self, platform):
+        env = platform.getEnv(self)
+        # Setup ccache as the compiler, use already set CXX as real compiler or environement CXX from docker image
+        env['CXX'] = f"ccache {env.get('CXX', '${CXX}')}"
+        return env
+
+    # Steps which don't depend on platform are created once per build and shared by all factories
+    @functools.lru_cache(maxsize=None)
+    def getCleanStep(self):
         # Standard way of cleaning build directory (current working one)
-        f.addStep(scummsteps.Clean(
+        return scummsteps.Clean(
             dir = "",
             doStepIf = util.Property("clean", False)
-        ))
+        )
+
+    @functools.lru_cache(maxsize=None)
+    def getFreshnessStep(self, configure_path):
+        return scummsteps.SetPropertyIfOlder(
+            name = f"check {self.CONFIGURE_GENERATED_FILE} freshness",
+            src = configure_path,
+            generated = self.CONFIGURE_GENERATED_FILE,
+            property = "do_configure"
+            )
+
+    def addCleanSteps(self, f, platform, *, env):
+        f.addStep(self.getCleanStep())
 
     def addConfigureSteps(self, f, platform, *,
             env, configure_path,
@@ -366,12 +511,7 @@ class StandardBuild(Build):
         if additional_args_after is None:
             additional_args_after = []
 
-        f.addStep(scummsteps.SetPropertyIfOlder(
-            name = "check {0} freshness".format(self.CONFIGURE_GENERATED_FILE),
-            src = configure_path,
-            generated = self.CONFIGURE_GENERATED_FILE,
-            property = "do_configure"
-            ))
+        f.addStep(self.getFreshnessStep(configure_path))
 
         command = [ configure_path ]
         command.extend(additional_args_before)
@@ -387,7 +527,7 @@ class StandardBuild(Build):
     def addBuildSteps(self, f, platform, *, env, **kwargs):
         f.addStep(steps.Compile(command = [
                 "make",
-                "-j{0}".format(max_jobs)
+                _MAKE_JOBS_ARG
             ],
             env = env,
             **kwargs))
@@ -432,12 +572,12 @@ class StandardBuild(Build):
                 env = env))
 
 class ScummVMBuild(StandardBuild):
-    __slots__ = [ 'verbose_build' ]
+    __slots__ = ()
 
-    PATCHES = [
-    ]
+    PATCHES = (
+    )
 
-    DATA_FILES = [
+    DATA_FILES = (
         "AUTHORS",
         "COPYING",
         "COPYRIGHT",
@@ -477,19 +617,13 @@ class ScummVMBuild(StandardBuild):
         "dists/engine-data/macventure.dat",
         "dists/engine-data/myst3.dat",
         "dists/engine-data/grim-patch.lab",
-        "dists/engine-data/monkey4-patch.m4b"
-    ]
+        "dists/engine-data/monkey4-patch.m4b",
+    )
     VERBOSE_BUILD_FLAG = "--enable-verbose-build"
     CONFIGURE_GENERATED_FILE = "configure.stamp"
     ENABLE_ENGINES_BUILD_FLAG = "--enable-all-engines"
     DISABLE_ENGINES_BUILD_FLAG = None
 
-    def __init__(self, *args, **kwargs):
-        verbose_build = kwargs.pop('verbose_build', False)
-
-        super().__init__(*args, **kwargs)
-        self.verbose_build = verbose_build
-
     def addConfigureSteps(self, *args, **kwargs):
         # Override to call parent with ScummVM specific configure arguments
         other_args = kwargs.pop('additional_args', [])
@@ -517,7 +651,7 @@ class ScummVMBuild(StandardBuild):
         if platform.build_devtools:
             f.addStep(steps.Compile(command = [
                     "make",
-                    "-j{0}".format(max_jobs),
+                    _MAKE_JOBS_ARG,
                     "devtools"
                 ],
                 name = "compile devtools",
@@ -526,8 +660,10 @@ class ScummVMBuild(StandardBuild):
 
 
 class ScummVMStableBuild(ScummVMBuild):
-    PATCHES = [
-    ]
+    __slots__ = ()
+
+    PATCHES = (
+    )
     # If we don't specify the engines enable flag, only enabled by default engines will be compiled in
     # but we must override platform split build settings
     ENABLE_ENGINES_BUILD_FLAG = None
@@ -536,34 +672,46 @@ class ScummVMStableBuild(ScummVMBuild):
     # Settings below (if any) are for stable version and must be updated when release is done
 
 class ScummVMToolsBuild(StandardBuild):
-    __slots__ = [ 'verbose_build' ]
+    __slots__ = ()
 
-    PATCHES = [
-    ]
+    PATCHES = (
+    )
 
-    DATA_FILES = [
+    DATA_FILES = (
         "COPYING",
         "NEWS",
         "README",
         "convert_dxa.sh",
-        "convert_dxa.bat"
-    ]
+        "convert_dxa.bat",
+    )
     VERBOSE_BUILD_FLAG = "--enable-verbose-build"
     CONFIGURE_GENERATED_FILE = "config.mk"
 
-    def __init__(self, *args, **kwargs):
-        verbose_build = kwargs.pop('verbose_build', False)
-
-        super().__init__(*args, **kwargs)
-        self.verbose_build = verbose_build
-
     def addTestsSteps(self, f, platform, *, env, **kwargs):
         # Don't do anything: we don't have tests of tools
         pass
 
+def getChangeSources(builds, builds_to_poll):
+    # Builds polling the same repository with the same settings share a single poller
+    # Their schedulers change filters already select their own branch
+    groups = []
+    for build in builds:
+        if build.name not in builds_to_poll:
+            continue
+        key = (build.giturl, builds_to_poll[build.name])
+        for group_key, group in groups:
+            if group_key == key:
+                group.append(build)
+                break
+        else:
+            groups.append((key, [build]))
+
+    for (_, settings), group in groups:
+        yield group[0].getChangeSource(settings, shared_with=group[1:])
+
 builds = []
 
-builds.append(ScummVMBuild("master", "https://github.com/scummvm/scummvm", "master", verbose_build=True, daily=(4, 1), description="ScummVM latest\nBranch master"))
-builds.append(ScummVMStableBuild("stable", "https://github.com/scummvm/scummvm", "branch-2-8", verbose_build=True, daily=(4, 1), description="ScummVM stable\nFuture 2.8.x"))
+builds.append(ScummVMBuild("master", "https://github.com/scummvm/scummvm", "master", verbose_build=True, daily=Daily(4, 1), description="ScummVM latest\nBranch master"))
+builds.append(ScummVMStableBuild("stable", "https://github.com/scummvm/scummvm", "branch-2-8", verbose_build=True, daily=Daily(4, 1), description="ScummVM stable\nFuture 2.8.x"))
 #builds.append(ScummVMBuild("gsoc2012", "https://github.com/digitall/scummvm", "gsoc2012-scalers-cont", verbose_build=True))
-builds.append(ScummVMToolsBuild("tools-master", "https://github.com/scummvm/scummvm-tools", "master", verbose_build=True, daily=(4, 1), description="ScummVM tools"))
+builds.append(ScummVMToolsBuild("tools-master", "https://github.com/scummvm/scummvm-tools", "master", verbose_build=True, daily=Daily(4, 1), description="ScummVM tools"))
@@ -1,4 +1,5 @@
 import copy
+import functools
 
 from buildbot.plugins import util
 
@@ -81,6 +82,8 @@ class Platform:
     def description(self, value):
         self.description_ = value
 
+    # Checked for each build by schedulers, builders and daily builds list
+    @functools.lru_cache(maxsize=None)
     def canBuild(self, build):
         return (_buildInData(self.compatibleBuilds, build) and
                 not _buildInData(self.incompatibleBuilds, build))
@@ -96,6 +99,8 @@ class Platform:
         if add is not None:
             ret.extend(add)
         return ret
+    # Checked for each build by the cleanup builder, packaging steps and daily builds list
+    @functools.lru_cache(maxsize=None)
     def canPackage(self, build):
         return _getFromBuild(self.packageable, build)
     def getBuiltFiles(self, build):